@@ -1,14 +1,18 @@
+import concurrent.futures
 import csv
 
 import numba as nb
 import numpy as np
+from numba import cuda
+from numba.cuda.random import (create_xoroshiro128p_states,
+                               xoroshiro128p_uniform_float64)
 
 """
 Ce document contient les classes et méthodes requises pour effectuer des
 simulations du modèle d'Ising.
 """
 
-@nb.njit
+@nb.njit(cache=True, fastmath=True)
 def ising_aleatoire(temperature, taille):
     """ Génère une grille aléatoire de spins.
 
@@ -18,20 +22,192 @@ def ising_aleatoire(temperature, taille):
     taille : La grille a une dimension taille x taille.
     """
     # On initialise aléatoirement des spins de valeurs -1 ou +1
-    # sur un grille de dimension taille x taille.
+    # sur un grille de dimension taille x taille. Les valeurs ±1 tiennent
+    # dans un int8 : la grille occupe 8 fois moins de cache qu'en int64 et
+    # l'auto-vectoriseur dispose de 8 fois plus de voies SIMD.
     spins = np.random.randint(0, 2, (taille, taille))
-    spins = 2 * spins - 1
+    spins = (2 * spins - 1).astype(np.int8)
     return Ising(temperature, spins)
 
 
+@nb.njit(cache=True, fastmath=True)
+def _essais_metropolis(spins, boltzmann, voisin_plus, voisin_moins, rx, ry, ru):
+    """Effectue une série d'essais Metropolis sur la grille et retourne les
+    variations d'énergie et d'aimantation accumulées.
+
+    Fonction libre (hors jitclass) opérant sur les tableaux bruts : les
+    lectures d'attributs d'une jitclass coûtent nettement plus cher qu'un
+    accès local, et la boucle chaude les éviterait mal autrement.
+
+    Arguments
+    ---------
+    spins : Tableau carré des valeurs de spins (modifié en place).
+    boltzmann : Table des facteurs e^(-ΔE / T) indexée par (ΔE + 8) // 4.
+    voisin_plus, voisin_moins : Tables d'indices voisins avec repliement
+        périodique (voisin_plus[x] = x + 1 mod n), qui remplacent le
+        modulo dans la boucle chaude.
+    rx, ry : Coordonnées des sites à essayer.
+    ru : Seuils uniformes dans [0, 1), un par essai.
+
+    Retourne
+    --------
+    (delta_energie, delta_aimantation) accumulés sur les essais acceptés.
+    """
+    delta_energie = 0
+    delta_aimantation = 0
+    for i in range(len(rx)):
+        x = rx[i]
+        y = ry[i]
+        somme_voisins = (
+            spins[voisin_plus[x], y]
+            + spins[voisin_moins[x], y]
+            + spins[x, voisin_plus[y]]
+            + spins[x, voisin_moins[y]]
+        )
+        Delta_E = 2 * spins[x, y] * somme_voisins
+        # Acceptation sans branche : la table contient e^(-ΔE/T) ≥ 1 pour
+        # ΔE ≤ 0, donc la seule comparaison au seuil couvre aussi
+        # l'acceptation inconditionnelle. Près de Tc la branche serait
+        # imprévisible (~50 % d'acceptation) et coûterait une
+        # mé-prédiction par essai raté.
+        accepte = np.int8(ru[i] < boltzmann[(Delta_E + 8) // 4])
+        spins[x, y] *= np.int8(1 - 2 * accepte) # ×(-1) si accepté, ×1 sinon
+        delta_energie += accepte * Delta_E
+        # le spin vient d'être inversé (ou pas) : M change de deux fois
+        # sa nouvelle valeur, ou de zéro
+        delta_aimantation += accepte * 2 * spins[x, y]
+    return delta_energie, delta_aimantation
+
+
+@nb.njit(parallel=True, cache=True, fastmath=True)
+def balayage_damier(spins, boltzmann, voisin_plus, voisin_moins, alea):
+    """Effectue un balayage en damier de la grille et retourne les
+    variations d'énergie et d'aimantation accumulées.
+
+    Les sites sont séparés en deux couleurs (noir/blanc selon la parité de
+    x + y) : les spins d'une même couleur n'interagissent pas entre eux et
+    peuvent donc être mis à jour en parallèle avec prange. La fonction est
+    libre (hors jitclass) et travaille sur les tableaux bruts, ce qui évite
+    le surcoût d'accès aux attributs de la jitclass dans la boucle chaude.
+
+    Arguments
+    ---------
+    spins : Tableau carré des valeurs de spins (modifié en place).
+    boltzmann : Table des facteurs e^(-ΔE / T) indexée par (ΔE + 8) // 4.
+    voisin_plus, voisin_moins : Tables d'indices voisins avec repliement
+        périodique, qui remplacent le modulo dans la boucle interne.
+    alea : Tableau (n, n) de seuils uniformes dans [0, 1), un par site.
+    """
+    n = spins.shape[0]
+    delta_energie = 0
+    delta_aimantation = 0
+    for couleur in range(2):
+        for x in nb.prange(n):
+            for y in range(n):
+                if (x + y) % 2 != couleur:
+                    continue
+                somme_voisins = (
+                    spins[voisin_plus[x], y]
+                    + spins[voisin_moins[x], y]
+                    + spins[x, voisin_plus[y]]
+                    + spins[x, voisin_moins[y]]
+                )
+                Delta_E = 2 * spins[x, y] * somme_voisins
+                # même test sans branche que dans _essais_metropolis
+                accepte = np.int8(alea[x, y] < boltzmann[(Delta_E + 8) // 4])
+                spins[x, y] *= np.int8(1 - 2 * accepte)
+                delta_energie += accepte * Delta_E
+                delta_aimantation += accepte * 2 * spins[x, y]
+    return delta_energie, delta_aimantation
+
+
+@cuda.jit
+def _noyau_metropolis_couleur(spins, boltzmann, etats_rng, couleur):
+    """Noyau CUDA : un essai Metropolis par site d'une couleur du damier.
+
+    Chaque fil prend le site (x, y) de cuda.grid(2) et ne fait rien si la
+    parité de x + y ne correspond pas à la couleur demandée. Les états du
+    générateur xoroshiro128p sont indexés par site (x * n + y).
+    """
+    x, y = cuda.grid(2)
+    n = spins.shape[0]
+    if x >= n or y >= n or (x + y) % 2 != couleur:
+        return
+    somme_voisins = (
+        spins[(x + 1) % n, y]
+        + spins[(x - 1 + n) % n, y]
+        + spins[x, (y + 1) % n]
+        + spins[x, (y - 1 + n) % n]
+    )
+    Delta_E = 2 * spins[x, y] * somme_voisins
+    if Delta_E <= 0:
+        spins[x, y] = -spins[x, y]
+    else:
+        seuil = xoroshiro128p_uniform_float64(etats_rng, x * n + y)
+        if seuil < boltzmann[(Delta_E + 8) // 4]:
+            spins[x, y] = -spins[x, y]
+
+
+def simulation_damier_cuda(Grille, nombre_balayages, graine=0):
+    """Simule le système par balayages en damier sur GPU.
+
+    Équivalent CUDA de Ising.simulation_damier : la grille reste en mémoire
+    du GPU pendant toute la série de balayages (un lancement de noyau par
+    couleur par balayage) et n'est recopiée vers l'hôte qu'à la fin. À
+    taille_grille = 32 le gain est marginal; ce chemin vise les grilles de
+    128 et plus, où le damier occupe assez de fils pour saturer le GPU.
+
+    Paramètres
+    ----------
+    Grille: ising.Ising
+        Grille de spin, mise à jour en place (spins et énergie).
+    nombre_balayages: int
+        Nombre de balayages complets (deux couleurs chacun).
+    graine: int
+        Graine du générateur xoroshiro128p (un état par site).
+
+    Retourne
+    --------
+    Grille: ising.Ising
+        La même grille, après les balayages.
+    """
+    if not cuda.is_available():
+        raise RuntimeError(
+            "Aucun GPU CUDA disponible; utiliser Ising.simulation_damier.")
+
+    n = int(Grille.taille)
+    spins_gpu = cuda.to_device(np.asarray(Grille.spins))
+    boltzmann_gpu = cuda.to_device(np.asarray(Grille.boltzmann))
+    etats_rng = create_xoroshiro128p_states(n * n, seed=graine)
+
+    dim_bloc = (16, 16)
+    dim_grille = ((n + dim_bloc[0] - 1) // dim_bloc[0],
+                  (n + dim_bloc[1] - 1) // dim_bloc[1])
+    for _ in range(int(nombre_balayages)):
+        for couleur in (0, 1):
+            _noyau_metropolis_couleur[dim_grille, dim_bloc](
+                spins_gpu, boltzmann_gpu, etats_rng, couleur)
+
+    # Une seule copie vers l'hôte pour toute la série de balayages; on
+    # resynchronise l'énergie incrémentale par un recalcul complet.
+    Grille.spins = spins_gpu.copy_to_host()
+    Grille.energie = Grille.calcule_energie()
+    Grille.aimantation = int(np.sum(np.asarray(Grille.spins), dtype=np.int64))
+    return Grille
+
+
 # Numba permet de compiler la classe pour qu'elle
 # soit plus rapide. Il faut attention car certaines
 # opérations ne sont plus permises.
 @nb.experimental.jitclass([
     ("temperature", nb.float64),
-    ("spins", nb.int64[:, :]),
+    ("spins", nb.int8[:, :]),
     ("taille", nb.uint64),
     ("energie", nb.int64),
+    ("aimantation", nb.int64),
+    ("boltzmann", nb.float64[:]),
+    ("voisin_plus", nb.int64[:]),
+    ("voisin_moins", nb.int64[:]),
 ])
 class Ising:
     """ Modèle de Ising paramagnétique en 2 dimensions.
@@ -50,20 +226,52 @@ class Ising:
         self.spins = spins
         self.taille = np.shape(spins)[0]
         self.energie = self.calcule_energie()
+        self.aimantation = np.sum(self.spins)
+        self.boltzmann = np.empty(5)
+        self._update_boltzmann()
+        # Tables d'indices voisins avec repliement périodique : une lecture
+        # de tableau remplace le modulo (division entière) dans les boucles
+        # chaudes, tout en gardant un stencil à pas unitaire.
+        n = np.int64(self.taille)
+        self.voisin_plus = np.empty(n, dtype=np.int64)
+        self.voisin_moins = np.empty(n, dtype=np.int64)
+        for i in range(n):
+            self.voisin_plus[i] = i + 1 if i + 1 < n else 0
+            self.voisin_moins[i] = i - 1 if i > 0 else n - 1
+
+    def _update_boltzmann(self):
+        """Recalcule la table des facteurs de Boltzmann e^(-ΔE / T).
+
+        Avec J = +1 sur une grille carrée, ΔE ne prend que les cinq valeurs
+        {-8, -4, 0, 4, 8}. On les précalcule pour remplacer l'appel à np.exp
+        par une lecture de tableau dans la boucle Metropolis. La table est
+        indexée par (ΔE + 8) // 4.
+        """
+        for i in range(5):
+            self.boltzmann[i] = np.exp(-(4 * i - 8) / self.temperature)
+
+    def modifie_temperature(self, temperature):
+        """Change la température du système et met à jour la table des
+        facteurs de Boltzmann en conséquence.
+        """
+        self.temperature = temperature
+        self._update_boltzmann()
 
     def difference_energie(self, x, y):
         """Retourne la différence d'énergie comme si le spin à la position (x, y)
         était inversé.
-        """
-        # Énergie avant le flip
-        energie_pre_flip = self.calcule_energie()
 
-        # calcul de l'énergie avec inversion du spin à (x,y)
-        self.spins[x,y] *= -1
-        energie_post_flip = self.calcule_energie()
-        self.spins[x,y] *= -1
-
-        return energie_post_flip - energie_pre_flip
+        Seul le spin à (x, y) change, donc ΔE ne dépend que de ses quatre
+        premiers voisins : ΔE = 2 s(x,y) [s(x±1,y) + s(x,y±1)]. On évite ainsi
+        de rebalayer toute la grille à chaque essai Metropolis.
+        """
+        somme_voisins = (
+            self.spins[self.voisin_plus[x], y]
+            + self.spins[self.voisin_moins[x], y]
+            + self.spins[x, self.voisin_plus[y]]
+            + self.spins[x, self.voisin_moins[y]]
+        )
+        return 2 * self.spins[x, y] * somme_voisins
 
     def iteration_aleatoire(self):
         """Renverse un spin aléatoire avec probabilité ~ e^(-ΔE / T).
@@ -75,31 +283,351 @@ class Ising:
         random_x_coord = np.random.randint(self.taille)
         random_y_coord = np.random.randint(self.taille)
 
-        Delta_E = self.difference_energie(random_x_coord, random_y_coord)
-
-        if random_float < np.exp(-Delta_E/self.temperature): # flip avec probabilité exp(-Delta_E/T)
+        # Calcul local de ΔE (même formule que difference_energie, écrite en
+        # ligne pour éviter le coût d'un appel de méthode jitclass dans la
+        # boucle chaude).
+        x = random_x_coord
+        y = random_y_coord
+        somme_voisins = (
+            self.spins[self.voisin_plus[x], y]
+            + self.spins[self.voisin_moins[x], y]
+            + self.spins[x, self.voisin_plus[y]]
+            + self.spins[x, self.voisin_moins[y]]
+        )
+        Delta_E = 2 * self.spins[x, y] * somme_voisins
+
+        # flip avec probabilité min(1, exp(-Delta_E/T)), lue dans la table
+        # précalculée plutôt que recalculée à chaque essai
+        if Delta_E <= 0 or random_float < self.boltzmann[(Delta_E + 8) // 4]:
             self.spins[random_x_coord, random_y_coord] *= -1
+            self.energie += Delta_E # mise à jour incrémentale de l'énergie
+            # le spin vient d'être inversé : M change de deux fois sa nouvelle valeur
+            self.aimantation += 2 * self.spins[random_x_coord, random_y_coord]
 
     def simulation(self, nombre_iterations):
         """Simule le système en effectuant des itérations aléatoires.
+
+        Les nombres aléatoires (coordonnées et seuil d'acceptation) sont
+        tirés en bloc plutôt qu'un à la fois : trois appels au générateur
+        par bloc au lieu de trois par essai. Les blocs sont limités à 2^16
+        essais pour borner la mémoire supplémentaire. La boucle chaude
+        elle-même vit dans _essais_metropolis, hors de la jitclass.
         """
-        for _ in range(nombre_iterations):
-            self.iteration_aleatoire()
+        restant = nombre_iterations
+        while restant > 0:
+            bloc = min(restant, 65536)
+            rx = np.random.randint(0, self.taille, bloc)
+            ry = np.random.randint(0, self.taille, bloc)
+            ru = np.random.random(bloc)
+            delta_energie, delta_aimantation = _essais_metropolis(
+                self.spins, self.boltzmann,
+                self.voisin_plus, self.voisin_moins, rx, ry, ru)
+            self.energie += delta_energie
+            self.aimantation += delta_aimantation
+            restant -= bloc
+
+    def simulation_damier(self, nombre_balayages):
+        """Simule le système par balayages en damier parallèles.
+
+        Chaque balayage visite une fois tous les sites (d'abord une couleur,
+        puis l'autre) et vaut donc N² essais Metropolis. Attention : la
+        dynamique par balayage diffère du tirage de sites aléatoires de
+        simulation(); les moyennes d'équilibre sont les mêmes mais les temps
+        de corrélation se comptent alors en balayages.
+        """
+        for _ in range(nombre_balayages):
+            alea = np.random.random((self.taille, self.taille))
+            delta_energie, delta_aimantation = balayage_damier(
+                self.spins, self.boltzmann,
+                self.voisin_plus, self.voisin_moins, alea)
+            self.energie += delta_energie
+            self.aimantation += delta_aimantation
 
     def calcule_energie(self):
-        """Retourne l'énergie actuelle de la grille de spins."""
+        """Retourne l'énergie actuelle de la grille de spins.
+
+        Le repliement périodique est fait avec un test plutôt qu'un modulo :
+        le modulo coûte une vingtaine de cycles par accès et empêche la
+        vectorisation de la boucle interne.
+        """
         energie = 0
         n = self.taille
         for x in range(n):
+            xp1 = x + 1 if x + 1 < n else 0
             for y in range(n):
-                energie -= self.spins[x, y] * self.spins[(x + 1) % n, y]
-                energie -= self.spins[x, y] * self.spins[x, (y + 1) % n]
+                yp1 = y + 1 if y + 1 < n else 0
+                energie -= self.spins[x, y] * self.spins[xp1, y]
+                energie -= self.spins[x, y] * self.spins[x, yp1]
         return energie
 
     def calcule_aimantation(self):
-        """Retourne l'aimantation actuelle de la grille de spins."""
-        return np.sum(self.spins)
+        """Retourne l'aimantation actuelle de la grille de spins.
+
+        La valeur est maintenue incrémentalement à chaque flip accepté, il
+        n'y a donc plus de réduction O(N²) par mesure.
+        """
+        return self.aimantation
+
+@nb.njit(cache=True)
+def ising_multispin_aleatoire(temperature, taille):
+    """ Génère une grille multi-spin aléatoire de 64 répliques.
+
+    Arguments
+    ---------
+    temperature : Température du système.
+    taille : La grille a une dimension taille x taille.
+    """
+    bits = np.empty((taille, taille), dtype=np.uint64)
+    for x in range(taille):
+        for y in range(taille):
+            # np.random.randint ne génère pas de uint64 directement :
+            # on assemble deux moitiés de 32 bits.
+            haut = np.uint64(np.random.randint(0, 2**32))
+            bas = np.uint64(np.random.randint(0, 2**32))
+            bits[x, y] = (haut << np.uint64(32)) | bas
+    return IsingMultiSpin(temperature, bits)
 
+
+@nb.experimental.jitclass([
+    ("temperature", nb.float64),
+    ("bits", nb.uint64[:, :]),
+    ("taille", nb.uint64),
+    ("boltzmann", nb.float64[:]),
+    ("voisin_plus", nb.int64[:]),
+    ("voisin_moins", nb.int64[:]),
+])
+class IsingMultiSpin:
+    """ Modèle de Ising 2D en codage multi-spin (64 répliques par mot).
+
+    Chaque cellule est un mot de 64 bits dont le bit k encode le spin de la
+    réplique k (bit 1 = spin +1, bit 0 = spin -1). Les 64 répliques sont
+    indépendantes et simulées à la même température par des opérations
+    bit à bit : un essai Metropolis met à jour les 64 grilles d'un coup,
+    ce qui fournit directement 64 mesures indépendantes pour le binning.
+
+    Arguments
+    ---------
+    temperature : Température du système.
+    bits : Tableau carré des mots de spins (uint64).
+    """
+
+    def __init__(self, temperature, bits):
+        self.temperature = temperature
+        self.bits = bits
+        self.taille = np.shape(bits)[0]
+        self.boltzmann = np.empty(5)
+        self._update_boltzmann()
+        # Mêmes tables d'indices voisins que pour Ising : pas de modulo
+        # dans la boucle chaude.
+        n = np.int64(self.taille)
+        self.voisin_plus = np.empty(n, dtype=np.int64)
+        self.voisin_moins = np.empty(n, dtype=np.int64)
+        for i in range(n):
+            self.voisin_plus[i] = i + 1 if i + 1 < n else 0
+            self.voisin_moins[i] = i - 1 if i > 0 else n - 1
+
+    def _update_boltzmann(self):
+        """Recalcule la table des facteurs de Boltzmann e^(-ΔE / T),
+        indexée par (ΔE + 8) // 4 comme pour la classe Ising.
+        """
+        for i in range(5):
+            self.boltzmann[i] = np.exp(-(4 * i - 8) / self.temperature)
+
+    def modifie_temperature(self, temperature):
+        """Change la température du système et met à jour la table des
+        facteurs de Boltzmann en conséquence.
+        """
+        self.temperature = temperature
+        self._update_boltzmann()
+
+    def iteration_aleatoire(self):
+        """Renverse un spin aléatoire dans chacune des 64 répliques avec
+        probabilité ~ e^(-ΔE / T).
+
+        Le nombre de voisins alignés par réplique (0 à 4) est compté en
+        tranche de bits avec des demi-additionneurs, puis l'acceptation se
+        fait par masques : ΔE = 4c - 8 est toujours accepté pour c ≤ 2, et
+        comparé à la table de Boltzmann pour c = 3 ou 4. Chaque réplique a
+        son propre seuil aléatoire pour rester indépendante des autres.
+        """
+        seuils = np.random.random(64)
+        x = np.random.randint(self.taille)
+        y = np.random.randint(self.taille)
+        self._essai_multispin(x, y, seuils)
+
+    def _essai_multispin(self, x, y, seuils):
+        """Effectue un essai Metropolis sur le site (x, y) des 64 répliques.
+
+        Arguments
+        ---------
+        x, y : Coordonnées du site.
+        seuils : Tableau de 64 seuils uniformes dans [0, 1), un par réplique.
+        """
+        mot = self.bits[x, y]
+        # 1 là où le spin de la réplique est aligné avec son voisin
+        a1 = ~(mot ^ self.bits[self.voisin_plus[x], y])
+        a2 = ~(mot ^ self.bits[self.voisin_moins[x], y])
+        a3 = ~(mot ^ self.bits[x, self.voisin_plus[y]])
+        a4 = ~(mot ^ self.bits[x, self.voisin_moins[y]])
+
+        # Compte des voisins alignés en tranche de bits (demi-additionneurs) :
+        # c = b0 + 2*b1 + 4*b2 pour chaque position de bit.
+        s0 = a1 ^ a2
+        c0 = a1 & a2
+        s1 = a3 ^ a4
+        c1 = a3 & a4
+        b0 = s0 ^ s1
+        retenue = s0 & s1
+        b1 = c0 ^ c1 ^ retenue
+        b2 = (c0 & c1) | (retenue & (c0 ^ c1))
+
+        # ΔE = 2 s Σ s_voisin = 4c - 8 : défavorable seulement pour c = 3 ou 4.
+        masque_c3 = b1 & b0 & ~b2
+        masque_c4 = b2
+
+        # Seuils d'acceptation par réplique pour ΔE = +4 et +8.
+        p4 = self.boltzmann[3]
+        p8 = self.boltzmann[4]
+        accepte_4 = np.uint64(0)
+        accepte_8 = np.uint64(0)
+        for k in range(64):
+            if seuils[k] < p4:
+                accepte_4 |= np.uint64(1) << np.uint64(k)
+            if seuils[k] < p8:
+                accepte_8 |= np.uint64(1) << np.uint64(k)
+
+        # ΔE ≤ 0 toujours accepté; sinon comparaison au seuil.
+        accepte = ~(masque_c3 | masque_c4)
+        accepte |= masque_c3 & accepte_4
+        accepte |= masque_c4 & accepte_8
+        self.bits[x, y] = mot ^ accepte
+
+    def simulation(self, nombre_iterations):
+        """Simule les 64 répliques en effectuant des itérations aléatoires.
+
+        Comme pour Ising.simulation, les nombres aléatoires sont tirés en
+        bloc; les blocs sont plus courts car chaque essai consomme 64
+        seuils (un par réplique).
+        """
+        restant = nombre_iterations
+        while restant > 0:
+            bloc = min(restant, 4096)
+            rx = np.random.randint(0, self.taille, bloc)
+            ry = np.random.randint(0, self.taille, bloc)
+            ru = np.random.random((bloc, 64))
+            for i in range(bloc):
+                self._essai_multispin(rx[i], ry[i], ru[i])
+            restant -= bloc
+
+    def calcule_energies(self):
+        """Retourne l'énergie actuelle de chacune des 64 répliques."""
+        n = self.taille
+        alignes = np.zeros(64, dtype=np.int64)
+        for x in range(n):
+            xp1 = x + 1 if x + 1 < n else 0
+            for y in range(n):
+                yp1 = y + 1 if y + 1 < n else 0
+                w1 = ~(self.bits[x, y] ^ self.bits[xp1, y])
+                w2 = ~(self.bits[x, y] ^ self.bits[x, yp1])
+                for k in range(64):
+                    decale = np.uint64(k)
+                    alignes[k] += np.int64((w1 >> decale) & np.uint64(1))
+                    alignes[k] += np.int64((w2 >> decale) & np.uint64(1))
+        # Chaque lien aligné contribue -1, chaque lien opposé +1.
+        nombre_liens = 2 * np.int64(n) * np.int64(n)
+        return nombre_liens - 2 * alignes
+
+    def calcule_aimantations(self):
+        """Retourne l'aimantation actuelle de chacune des 64 répliques."""
+        n = self.taille
+        hauts = np.zeros(64, dtype=np.int64)
+        for x in range(n):
+            for y in range(n):
+                mot = self.bits[x, y]
+                for k in range(64):
+                    hauts[k] += np.int64((mot >> np.uint64(k)) & np.uint64(1))
+        # M = (#spins hauts) - (#spins bas) = 2 * #hauts - N².
+        return 2 * hauts - np.int64(n) * np.int64(n)
+
+
+@nb.experimental.jitclass([
+    ("nombre_valeurs", nb.int64),
+    ("somme", nb.float32),
+    ("somme_carres", nb.float32),
+    ("valeur_precedente", nb.float32),
+    ("compensation_somme", nb.float32),
+    ("compensation_carres", nb.float32),
+])
+class NiveauBinning:
+    """Statistiques d'un seul niveau de binning.
+
+    Regrouper les scalaires d'un niveau dans un petit objet (plutôt que
+    des tableaux indexés par le niveau) permet au compilateur de garder en
+    registres les champs du niveau visité par ajout_mesure.
+
+    Les accumulateurs sont en float32 (les mesures viennent d'un réseau
+    entier borné par ±N², largement représentable) avec sommation
+    compensée de Kahan : les termes perdus par l'arrondi simple précision
+    sont rattrapés dans un scalaire de compensation, ce qui préserve la
+    précision des 2^16 additions du niveau 0 tout en divisant par deux
+    l'empreinte mémoire des statistiques.
+    """
+
+    def __init__(self):
+        self.nombre_valeurs = 0
+        self.somme = np.float32(0.0)
+        self.somme_carres = np.float32(0.0)
+        self.valeur_precedente = np.float32(0.0)
+        self.compensation_somme = np.float32(0.0)
+        self.compensation_carres = np.float32(0.0)
+
+    def ajoute(self, valeur):
+        """Accumule une valeur dans les sommes compensées du niveau."""
+        self.nombre_valeurs += 1
+        valeur = np.float32(valeur)
+
+        # Sommation de Kahan : y récupère la compensation du tour
+        # précédent, et la nouvelle compensation capture ce que
+        # l'addition en float32 vient d'arrondir.
+        y = valeur - self.compensation_somme
+        t = self.somme + y
+        self.compensation_somme = (t - self.somme) - y
+        self.somme = t
+
+        y = valeur * valeur - self.compensation_carres
+        t = self.somme_carres + y
+        self.compensation_carres = (t - self.somme_carres) - y
+        self.somme_carres = t
+
+    def erreur(self):
+        """Retourne l'erreur estimée à ce niveau de binning."""
+        somme = np.float64(self.somme)
+        somme_carres = np.float64(self.somme_carres)
+        return np.sqrt(
+            (
+                somme_carres
+                - somme**2 / self.nombre_valeurs
+            ) / (
+                self.nombre_valeurs
+                * (self.nombre_valeurs - 1)
+            )
+        )
+
+
+# Type Numba d'un niveau, référencé comme constante globale : l'attribut
+# class_type n'est pas accessible depuis le code compilé lui-même.
+_type_niveau_binning = NiveauBinning.class_type.instance_type
+
+
+# Comme pour Ising, la compilation jitclass supprime le coût de dispatch
+# Python des deux appels à ajout_mesure par mesure et permet d'appeler
+# les méthodes depuis du code @njit.
+@nb.experimental.jitclass([
+    ("nombre_niveaux", nb.int64),
+    ("niveaux", nb.types.ListType(_type_niveau_binning)),
+    ("niveau_erreur", nb.int64),
+    ("erreurs", nb.float64[:]),
+])
 class Observable:
     """Utilise la méthode du binning pour calculer des statistiques
     pour un observable.
@@ -114,12 +642,9 @@ class Observable:
         self.nombre_niveaux = nombre_niveaux
 
         # Les statistiques pour chaque niveau
-        self.nombre_valeurs = np.zeros(nombre_niveaux + 1, dtype=np.int64)
-        self.sommes = np.zeros(nombre_niveaux + 1)
-        self.sommes_carres = np.zeros(nombre_niveaux + 1)
-
-        # La dernière valeur ajoutée à chaque niveau.
-        self.valeurs_precedentes = np.zeros(nombre_niveaux + 1)
+        self.niveaux = nb.typed.List.empty_list(_type_niveau_binning)
+        for _ in range(nombre_niveaux + 1):
+            self.niveaux.append(NiveauBinning())
 
         # Le niveau que nous allons utiliser.
         # La différence de 6 donne de bons résultats.
@@ -129,30 +654,35 @@ class Observable:
         # Les erreurs par niveau de binning
         self.erreurs = np.zeros(self.niveau_erreur + 1)
 
-    def ajout_mesure(self, valeur, niveau=0):
+    def ajout_mesure(self, valeur):
         """Ajoute une mesure.
 
+        On monte les niveaux itérativement plutôt que par récursion :
+        chaque fois qu'un niveau atteint un nombre pair de valeurs, la
+        moyenne des deux dernières est propagée au niveau suivant, et on
+        s'arrête au premier niveau qui reste impair. Cela évite d'empiler
+        un cadre d'appel par niveau et reste compatible avec une
+        éventuelle compilation Numba (pas de récursion).
+
         Arguments
         ---------
         valeur : Valeur de la mesure.
-        niveau : Niveau à lequel ajouter la mesure. Par défaut,
-                 le niveau doit toujours être 0. Les autres niveaux
-                 sont seulement utilisé pour la récursion.
         """
-        self.nombre_valeurs[niveau] += 1
-        self.sommes[niveau] += valeur
-        self.sommes_carres[niveau] += valeur*valeur
-        # Si un nombre pair de valeurs a été ajouté,
-        # on peut faire une simplification.
-        if self.nombre_valeurs[niveau] % 2 == 0:
-            moyenne = (valeur + self.valeurs_precedentes[niveau]) / 2
-            self.ajout_mesure(moyenne, niveau + 1)
-        else:
-            self.valeurs_precedentes[niveau] = valeur
+        niveau = 0
+        while True:
+            courant = self.niveaux[niveau]
+            courant.ajoute(valeur)
+            # Si le niveau reste impair, la valeur attend sa jumelle.
+            if courant.nombre_valeurs % 2 == 1:
+                courant.valeur_precedente = valeur
+                return
+            # Sinon on propage la moyenne des deux dernières valeurs.
+            valeur = (valeur + courant.valeur_precedente) / 2
+            niveau += 1
 
     def est_rempli(self):
         """Retourne vrai si le binnage est complété."""
-        return self.nombre_valeurs[0] == 2**self.nombre_niveaux
+        return self.niveaux[0].nombre_valeurs == 2**self.nombre_niveaux
 
     def update_erreurs(self):
         """Retourne l'erreur sur le mesure moyenne de l'observable.
@@ -160,15 +690,7 @@ class Observable:
         Le dernier niveau doit être rempli avant d'utiliser cette fonction.
         """
         for niveau in range(self.niveau_erreur + 1):
-            self.erreurs[niveau] = np.sqrt(
-                (
-                    self.sommes_carres[niveau]
-                    - self.sommes[niveau]**2 / self.nombre_valeurs[niveau]
-                ) / (
-                    self.nombre_valeurs[niveau]
-                    * (self.nombre_valeurs[niveau] - 1)
-                )
-            )
+            self.erreurs[niveau] = self.niveaux[niveau].erreur()
 
     def erreur(self):
         """meilleure estimation de l'erreur
@@ -184,7 +706,28 @@ class Observable:
 
     def moyenne(self):
         """Retourne la moyenne des mesures."""
-        return self.sommes[0]/self.nombre_valeurs[0] # la moyenne arithmétique des mesures
+        return np.float64(self.niveaux[0].somme)/self.niveaux[0].nombre_valeurs # la moyenne arithmétique des mesures
+
+
+@nb.njit
+def _collecte_mesures(Grille, Aimantation, Energie, iter_intermesure,
+                      nombre_mesures, update_status_interval):
+    """Boucle de collecte des mesures, entièrement compilée.
+
+    La grille et les deux observables étant des jitclass, toute la boucle
+    (brouillage + mesures + binning) s'exécute dans une seule région Numba
+    au lieu de retraverser la frontière Python à chaque mesure.
+    """
+    for i in range(nombre_mesures):
+        if i % update_status_interval == 0: # faire un printout régulier pour les impatients!
+            print("Iteration", i)
+
+        # brouillage de la grille entre les mesures
+        Grille.simulation(iter_intermesure)
+
+        # Ajouter les valeurs courantes au observables
+        Aimantation.ajout_mesure(Grille.calcule_aimantation())
+        Energie.ajout_mesure(Grille.energie)
 
 
 def etape_monte_carlo(Grille, iter_intermesure, iter_thermalisation, niveaux_binning, update_status_interval=5000):
@@ -214,6 +757,12 @@ def etape_monte_carlo(Grille, iter_intermesure, iter_thermalisation, niveaux_bin
         Énergie de la grille.
     """
 
+    # Les nombres d'itérations arrivent parfois en flottant (1e6 etc.) :
+    # on les fige en entiers ici pour que les régions compilées reçoivent
+    # directement des int64, sans conversion implicite à chaque appel.
+    iter_intermesure = int(iter_intermesure)
+    iter_thermalisation = int(iter_thermalisation)
+
     # initialization des observables
     Aimantation = Observable(niveaux_binning)
     Energie = Observable(niveaux_binning)
@@ -224,28 +773,33 @@ def etape_monte_carlo(Grille, iter_intermesure, iter_thermalisation, niveaux_bin
 
     print("Collecte des mesures")
     # remplissage des listes de binning (pas besoin de self.est_rempli...)
-    for i in range(2**niveaux_binning):
-        if i % update_status_interval == 0: # faire un printout régulier pour les impatients!
-            print(f"Iteration {i}")
-
-        # brouillage de la grille entre les mesures
-        Grille.simulation(iter_intermesure)
+    # dans une seule région compilée, sans aller-retour Python par mesure
+    _collecte_mesures(Grille, Aimantation, Energie, iter_intermesure,
+                      1 << niveaux_binning, update_status_interval)
 
-        # Calcul des valeurs actuelles des opérateurs
-        aimantation_courante = Grille.calcule_aimantation()
-        energie_courante = Grille.calcule_energie()
+    return Grille, Aimantation, Energie
 
-        # Ajouter les valeurs courantes au observables
-        Aimantation.ajout_mesure(aimantation_courante)
-        Energie.ajout_mesure(energie_courante)
 
-    return Grille, Aimantation, Energie
+def ecrire_resultats(nom_fichier, rangees):
+    """Cette fonction permet d'écrire les résultats dans un fichier. Ces résultat
+    sont écris en grille de valeurs assosicées par rangées, une par
+    température, sous une rangée d'en-tête.
 
+    Le fichier est ouvert et écrit en une seule fois plutôt que rouvert en
+    mode ajout à chaque température : une interruption laisse soit le
+    fichier précédent, soit le fichier complet, jamais un fragment.
 
-def initialiser_fichier_resultats(nom_fichier):
-    """Crée le fichier qui servira à stocker les résultats.
+    Paramètres
+    ----------
+    nom_fichier: str
+        Nom du fichier dans lequel écrire.
+    rangees: list[tuple]
+        Rangées de résultats (temperature, moyenne_aimantation,
+        erreur_aimantation, t_corr_aimantation, moyenne_energie,
+        erreur_energie, t_corr_energie), telles que produites par
+        _resume_observables.
     """
-    with open(nom_fichier, 'w+') as f:
+    with open(nom_fichier, 'w', newline='') as f:
         writer = csv.writer(f) # objet writer
         writer.writerow([
             "temperature",
@@ -256,49 +810,60 @@ def initialiser_fichier_resultats(nom_fichier):
             "erreur_energie",
             "t_corr_energie"
             ]) # les noms des colonnes
+        writer.writerows(rangees)
 
 
-def ecrire_resultats(nom_fichier,
-                     temperature,
-                     moyenne_aimantation,
-                     erreur_aimantation,
-                     t_corr_aimantation,
-                     moyenne_energie,
-                     erreur_energie,
-                     t_corr_energie):
-    """Cette fonction permet d'écrire les résultats dans un fichier. Ces résultat
-    sont écris en grille de valeurs assosicées par rangées
+@nb.njit
+def _graine_aleatoire(graine):
+    """Initialise le générateur aléatoire interne de Numba.
+
+    Les tirages des boucles compilées utilisent le générateur de Numba,
+    distinct de celui de numpy côté Python : il faut le semer depuis du
+    code @njit pour que chaque processus travailleur ait sa propre suite.
+    """
+    np.random.seed(graine)
+
+
+def _resume_observables(temperature, Aimantation, Energie):
+    """Calcule les erreurs des deux observables et retourne la rangée de
+    résultats (dans l'ordre des colonnes du fichier CSV) pour une température.
+    """
+    # Calcul des erreurs à chaque niveau
+    Aimantation.update_erreurs()
+    Energie.update_erreurs()
+
+    return (temperature,
+            Aimantation.moyenne(),
+            Aimantation.erreur(),
+            Aimantation.temps_correlation(),
+            Energie.moyenne(),
+            Energie.erreur(),
+            Energie.temps_correlation())
+
+
+def _simuler_une_temperature(parametres):
+    """Simule une seule température dans un processus travailleur.
+
+    Les simulations à différentes températures sont indépendantes : chaque
+    travailleur construit sa propre grille (les jitclass ne se picklent
+    pas, d'où la construction dans le processus fils), sème le générateur
+    avec sa graine propre, thermalise à froid et retourne la rangée de
+    résultats.
 
     Paramètres
     ----------
-    nom_fichier: str
-        Nom du fichier dans lequel écrire.
-    temperature: float
-        Température du système de spins.
-    moyenne_aimantation: float
-        Moyenne de l'aimantation du système.
-    erreur_aimantation: float
-        Erreur sur la moyenne de l'aimantation.
-    t_corr_aimantation: float
-        Temps de corrélation sur l'aimantation.
-    moyenne_energie: float
-        Moyenne de l'énergie du système.
-    erreur_energie: float
-        Erreur sur la moyenne
-    t_corr_energie: float
-
+    parametres: tuple
+        (temperature, taille_grille, iter_intermesure, iter_thermalisation,
+        niveaux_binning, graine).
     """
-    with open(nom_fichier, 'a') as f:
-        writer = csv.writer(f) # objet writer
-        writer.writerow([
-            temperature,
-            moyenne_aimantation,
-            erreur_aimantation,
-            t_corr_aimantation,
-            moyenne_energie,
-            erreur_energie,
-            t_corr_energie
-            ]) # les noms des colonnes
+    (temperature, taille_grille, iter_intermesure,
+     iter_thermalisation, niveaux_binning, graine) = parametres
+
+    _graine_aleatoire(graine)
+    Grille = ising_aleatoire(temperature, taille_grille)
+    Grille, Aimantation, Energie = etape_monte_carlo(
+        Grille, iter_intermesure, iter_thermalisation, niveaux_binning)
+    return _resume_observables(temperature, Aimantation, Energie)
 
 
 def simuler(temperature_ini,
@@ -306,9 +871,10 @@ def simuler(temperature_ini,
             pas_temperature,
             nom_fichier="data_monte_carlo_ising.csv",
             taille_grille=32,
-            iter_intermesure=1e3,
-            iter_thermalisation=1e6,
-            niveaux_binning=16):
+            iter_intermesure=1_000,
+            iter_thermalisation=1_000_000,
+            niveaux_binning=16,
+            nombre_processus=1):
     """ Effectue les simulations Monte-Carlo pour un intervalle de températures.
 
     Paramètres
@@ -331,46 +897,52 @@ def simuler(temperature_ini,
         (1 000 000 par défaut).
     niveaux_binning=16:
         Puissance de 2 du nombre de mesure (16 par défaut).
+    nombre_processus=1:
+        Nombre de processus travailleurs. À 1 (défaut), les températures
+        sont simulées en séquence en réutilisant la grille thermalisée de
+        la température précédente. Au-delà, chaque température est simulée
+        dans son propre processus (départ à froid, graine distincte) — les
+        simulations sont indépendantes et le balayage est alors limité par
+        le nombre de coeurs.
     """
+    # entiers dès la frontière : les valeurs passées en flottant (1e6...)
+    # seraient refusées ou converties par les régions compilées
+    iter_intermesure = int(iter_intermesure)
+    iter_thermalisation = int(iter_thermalisation)
+
     # liste des temperatures à simuler
     liste_temperatures = np.arange(temperature_ini, temperature_fin, pas_temperature)
 
+    if nombre_processus > 1:
+        # Balayage parallèle : une température par travailleur.
+        parametres = [
+            (float(temperature), taille_grille, iter_intermesure,
+             iter_thermalisation, niveaux_binning, graine)
+            for graine, temperature in enumerate(liste_temperatures)
+        ]
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=nombre_processus) as executeur:
+            # map préserve l'ordre des températures dans le fichier
+            rangees = list(executeur.map(_simuler_une_temperature, parametres))
+        ecrire_resultats(nom_fichier, rangees)
+        return
+
     # initialisation de la grille de spins
     Grille = ising_aleatoire(temperature_ini, taille_grille)
 
-    # initialisation du fichier de data
-    initialiser_fichier_resultats(nom_fichier)
-
     # Execution de la simulation pour les températures spécifiées
+    rangees = []
     for temperature in liste_temperatures:
         print(f"--- Simulation à T={temperature} en cours ---")
-        Grille.temperature = temperature # mise à jour de la température de la grille
+        Grille.modifie_temperature(temperature) # mise à jour de la température et de la table de Boltzmann
 
         # Génération des deux observables 'à jour' et récupération de la grille thermalisée à la temp. courante
         Grille, Aimantation, Energie = etape_monte_carlo(Grille, iter_intermesure, iter_thermalisation, niveaux_binning)
 
-        # Calcul des erreurs à chaque niveau
-        Aimantation.update_erreurs()
-        Energie.update_erreurs()
-
-        # Chercher les valeurs importantes
-        moyenne_aimantation = Aimantation.moyenne()
-        erreur_aimantation = Aimantation.erreur()
-        temps_correlation_aimantation = Aimantation.temps_correlation()
-
-        moyenne_energie = Energie.moyenne()
-        erreur_energie = Energie.erreur()
-        temps_correlation_energie = Energie.temps_correlation()
-
-        ecrire_resultats(nom_fichier,
-                    temperature,
-                    moyenne_aimantation,
-                    erreur_aimantation,
-                    temps_correlation_aimantation,
-                    moyenne_energie,
-                    erreur_energie,
-                    temps_correlation_energie
-                )
+        rangees.append(_resume_observables(temperature, Aimantation, Energie))
+
+    # une seule ouverture de fichier pour tout le balayage
+    ecrire_resultats(nom_fichier, rangees)
 
 
 if __name__ == "__main__":